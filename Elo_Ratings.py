@@ -1,135 +1,517 @@
 import streamlit as st
 import gspread
+from gspread.utils import rowcol_to_a1, absolute_range_name, fill_gaps
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 import json
+import logging
+import atexit
 import pandas as pd
-import random
+import numpy as np
 import datetime
+import threading
+import time
+import random
 
-creds_dict = st.secrets["gcp_service_account"]
 scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
-client = gspread.authorize(creds)
+ELO_SHEET_URL = "https://docs.google.com/spreadsheets/d/13yXfj4jC_AjKuvtPpdf9OeoZ-p_ifdTrw5Kw9w6afP4/edit"
+VALUE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1Qt7zriA6f696jAeXv3XvzdJPmml8QuplGU9fU-3-SRs/edit"
+
+
+@st.cache_resource
+def get_sheets():
+    """Authorizes once per process and returns the (elo, votes, value) worksheet handles."""
+    creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scope)
+    client = gspread.authorize(creds)
+
+    # ✅ Keep a pool of warm HTTPS connections so reruns, sessions and the write flusher
+    # reuse TLS sessions to the Sheets API instead of handshaking per request
+    client.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=3))
+
+    # ✅ Reuse the Elo spreadsheet for UserVotes when it is the same file (skips a Drive lookup)
+    elo_spreadsheet = client.open_by_url(ELO_SHEET_URL)
+    if elo_spreadsheet.title == "Community Elo Ratings":
+        votes_spreadsheet = elo_spreadsheet
+    else:
+        votes_spreadsheet = client.open("Community Elo Ratings")
+
+    return (
+        elo_spreadsheet.worksheet("Sheet1"),
+        votes_spreadsheet.worksheet("UserVotes"),
+        client.open_by_url(VALUE_SHEET_URL).worksheet("HPPR Rankings")
+    )
+
 
-# ✅ Access Sheets directly without making read requests
-elo_sheet = client.open_by_url("https://docs.google.com/spreadsheets/d/13yXfj4jC_AjKuvtPpdf9OeoZ-p_ifdTrw5Kw9w6afP4/edit").worksheet("Sheet1")
-votes_sheet = client.open("Community Elo Ratings").worksheet("UserVotes")
-value_sheet = client.open_by_url("https://docs.google.com/spreadsheets/d/1Qt7zriA6f696jAeXv3XvzdJPmml8QuplGU9fU-3-SRs/edit").worksheet("HPPR Rankings")
+# ✅ Reuse the same authorized client and worksheet handles across reruns
+elo_sheet, votes_sheet, value_sheet = get_sheets()
 
 
 ### ✅ **Functions That Use Only Google Sheet Data (No Read Requests)**
 
-def get_players():
+def sheet_frame(all_values):
+    """Builds a frame from raw sheet rows, keeping every column (blank and duplicate headers too)."""
+    return pd.DataFrame(all_values[1:], columns=all_values[0])
+
+
+def numeric_column(values, default, dtype):
+    """Parses sheet strings into a typed array in one pass, filling blank/bad cells with `default`."""
+    parsed = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+    parsed[np.isnan(parsed)] = default
+    return parsed.astype(dtype, copy=False)
+
+
+def position_ranks(pos, elo):
+    """Min-method rank of each Elo within its position (1 = highest), from one lexsort."""
+    codes = pd.factorize(pos)[0]
+    order = np.lexsort((-elo, codes))
+    sorted_codes, sorted_elo = codes[order], elo[order]
+
+    # Ties share the rank of their first row; each position restarts at 1
+    new_group = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+    new_value = new_group | np.r_[True, sorted_elo[1:] != sorted_elo[:-1]]
+    idx = np.arange(len(order))
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0))
+    value_start = np.maximum.accumulate(np.where(new_value, idx, 0))
+
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = value_start - group_start + 1
+    return ranks
+
+
+def read_sheet_values():
+    """Fetches the player and user-vote sheets, in a single batchGet when they share a spreadsheet."""
+    spreadsheet = elo_sheet.spreadsheet
+    if spreadsheet.id != votes_sheet.spreadsheet.id:
+        return elo_sheet.get_all_values(), votes_sheet.get_all_values()
+
+    response = spreadsheet.values_batch_get(
+        [absolute_range_name(elo_sheet.title), absolute_range_name(votes_sheet.title)]
+    )
+    players_values, votes_values = (fill_gaps(r.get("values", [])) for r in response["valueRanges"])
+    return players_values, votes_values
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_sheet_values(generation):
+    """Cached read_sheet_values() for rendering, keyed by write-buffer generation (the flusher reads fresh)."""
+    return read_sheet_values()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_players(generation):
     """Instantly pulls all player data from Google Sheets without read requests."""
-    all_values = elo_sheet.get_all_values()
-    df = pd.DataFrame(all_values[1:], columns=all_values[0])  # First row is headers
+    df = sheet_frame(get_sheet_values(generation)[0])  # First row is headers
 
-    # Convert numeric columns
-    df["elo"] = pd.to_numeric(df["elo"], errors="coerce").fillna(1500).astype(float)
-    df["Votes"] = pd.to_numeric(df["Votes"], errors="coerce").fillna(0).astype(int)
+    # Convert numeric columns in place so frame columns still line up with sheet columns
+    df["elo"] = numeric_column(df["elo"], 1500, np.float64)
+    df["Votes"] = numeric_column(df["Votes"], 0, np.int64)
 
     # Compute ranks in-memory instead of re-reading
-    df["pos_rank"] = df.groupby("pos")["elo"].rank(method="min", ascending=False).astype(int)
+    df["pos_rank"] = position_ranks(df["pos"].to_numpy(), df["elo"].to_numpy())
 
     return df
 
 
-def get_user_data():
+@st.cache_data(ttl=30, show_spinner=False)  # Shorter TTL, other users' votes land here
+def get_user_data(generation):
     """Instantly pulls user vote data from Google Sheets without read requests."""
-    all_values = votes_sheet.get_all_values()
-    df = pd.DataFrame(all_values[1:], columns=all_values[0])  # First row is headers
+    df = sheet_frame(get_sheet_values(generation)[1])  # First row is headers
+
+    # Convert numeric columns once so callers never re-parse them
+    df["total_votes"] = numeric_column(df["total_votes"], 0, np.int64)
+    df["weekly_votes"] = numeric_column(df["weekly_votes"], 0, np.int64)
     df["username"] = df["username"].str.lower()  # Normalize usernames to lowercase
+    df.index = pd.Index(df["username"].to_numpy())  # ✅ Hashed index for O(1) user lookups
 
     return df
 
 
-def get_player_value(player_name):
-    """Fetches player value from Google Sheets directly (no read requests)."""
+@st.cache_data(ttl=600, show_spinner=False)
+def get_player_values():
+    """Loads the HPPR sheet once into a {lowercase name: value} dict (votes never change it)."""
     all_values = value_sheet.get_all_values()
-    df = pd.DataFrame(all_values[1:], columns=all_values[0])
+    name_col, value_col = all_values[0].index("Player Name"), all_values[0].index("Value")
 
-    player_row = df[df["Player Name"].str.lower() == player_name.lower()]
-    return float(player_row["Value"].values[0]) if not player_row.empty else None
+    values = {}
+    for row in all_values[1:]:
+        try:
+            values.setdefault(row[name_col].lower(), float(row[value_col]))  # First match wins, like the old filter
+        except (IndexError, ValueError):
+            continue  # Skip rows without a usable value
+    return values
 
 
-def update_user_vote(username, count_vote=True, user_data=None):
-    """Updates user vote data in Google Sheets without extra read requests."""
-    if user_data is None:
-        user_data = get_user_data()  # Ensure user data is loaded
+def get_player_value(player_name):
+    """Looks up a player's value in the cached HPPR data (no read requests)."""
+    return get_player_values().get(player_name.lower())
 
-    df = user_data  # Use preloaded data
-    username_lower = username.lower()
 
-    user_row = df[df["username"] == username_lower]
+def apply_user_delta(total_votes, weekly_votes, last_voted, delta):
+    """Applies buffered vote counts to a user's sheet values, resetting the weekly count on a new Monday."""
+    voted = delta["last_voted"]
+    if datetime.date.fromisoformat(voted).weekday() == 0 and last_voted != voted:
+        weekly_votes = 0
+    return total_votes + delta["total_votes"], weekly_votes + delta["weekly_votes"], voted
+
+
+def update_user_vote(username, count_vote=True):
+    """Queues the user's vote counts as increments; the flusher applies them to a fresh read."""
+    username_lower = username.lower()
     today = datetime.date.today().strftime("%Y-%m-%d")
 
-    updates = []
-    if user_row.empty:
-        votes_sheet.append_row([username, 1 if count_vote else 0, 1 if count_vote else 0, today])
+    user_data = load_user_data()  # ✅ Cached, plus every vote still waiting to be flushed
+
+    # ✅ Hashed index lookup (first match wins, the same row the flusher updates)
+    user_pos = user_data.index.get_indexer_for([username_lower])[0]
+
+    if user_pos == -1:
+        new_votes = 1 if count_vote else 0
+        votes_sheet.append_row([username, new_votes, new_votes, today])
+
+        # ✅ The append is synchronous, so retire cached reads now; a reload must find this row
+        buffer = get_write_buffer()
+        with buffer["lock"]:
+            invalidate_reads(buffer)
         return
 
-    row_idx = user_row.index[0] + 2  # Adjust for Google Sheets indexing
-    total_votes_col, weekly_votes_col, last_voted_col = 2, 3, 4
+    user_row = user_data.iloc[user_pos]
+    current_row = (int(user_row["total_votes"]), int(user_row["weekly_votes"]), user_row["last_voted"])
+    delta = {"total_votes": int(count_vote), "weekly_votes": int(count_vote), "last_voted": today}
+
+    # ✅ Queue the increments, skipping them when the row would not change (e.g. re-tracking today)
+    if apply_user_delta(*current_row, delta) != current_row:
+        queue_delta("users", username_lower, delta)
+
+
+def update_google_sheet(player1_name, player1_elo_change, player2_name, player2_elo_change):
+    """Queues both players' Elo changes and +1 Votes for the next buffered flush."""
+    queue_delta("players", player1_name.lower(), {"elo": player1_elo_change, "Votes": 1})
+    queue_delta("players", player2_name.lower(), {"elo": player2_elo_change, "Votes": 1})
+
+### ✅ **Buffered Writes (Flushed Together Instead of Once Per Vote)**
+FLUSH_INTERVAL_SECONDS = 30
+FLUSH_EVERY_VOTES = 10
+FLUSH_MAX_ATTEMPTS = 5  # Consecutive failures before the pending deltas are parked
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_write_buffer():
+    """Process-wide buffer of pending vote deltas, flushed by a background thread."""
+    buffer = {
+        "lock": threading.Lock(),
+        "flush_lock": threading.Lock(),  # One flush at a time, or deltas could be applied twice
+        "wake": threading.Event(),
+        "pending": {"players": {}, "users": {}},
+        "votes": 0,
+        "generation": 0,  # Bumped whenever a flush lands; cached reads are keyed by it
+        "failures": 0,
+        "parked": []  # Deltas that kept failing, kept (and logged) for manual recovery
+    }
+
+    def flush_forever():
+        while True:
+            buffer["wake"].wait(FLUSH_INTERVAL_SECONDS)  # Tick, or flush early when a vote asks to
+            buffer["wake"].clear()
+            try:
+                flush_writes(buffer)
+            except Exception:
+                logger.exception("Write flusher tick failed")
+
+    def flush_on_exit():
+        try:
+            flush_writes(buffer)
+        except Exception:
+            logger.exception("Final write flush failed")
+
+    # ✅ The daemon thread dies with the process, so send what is left on a clean shutdown
+    threading.Thread(target=flush_forever, daemon=True).start()
+    atexit.register(flush_on_exit)
+    return buffer
+
+
+def merge_deltas(current, delta):
+    """Sums the numeric fields of two deltas; dates keep the newest value."""
+    return {field: value if isinstance(value, str) else current[field] + value for field, value in delta.items()}
+
+
+def remaining_delta(current, sent):
+    """What is left of `current` once `sent` has been written, or None if nothing is."""
+    left = {field: value if isinstance(value, str) else value - sent[field] for field, value in current.items()}
+    if any(value != (sent[field] if isinstance(value, str) else 0) for field, value in left.items()):
+        return left
+    return None
+
+
+def queue_delta(kind, key, delta):
+    """Buffers a change for one player or user ("players"/"users"); repeated changes add up."""
+    buffer = get_write_buffer()
+    with buffer["lock"]:
+        pending = buffer["pending"][kind]
+        pending[key] = delta if key not in pending else merge_deltas(pending[key], delta)
+
+
+def cell_number(value, default):
+    """Parses one sheet cell the way numeric_column does, falling back to `default`."""
+    try:
+        number = float(value)
+    except ValueError:
+        return default
+    return default if np.isnan(number) else number
+
+
+def first_rows(all_values, key_col):
+    """Maps each lowercase key cell to its 0-based data row, keeping the first duplicate."""
+    rows = {}
+    for i, row in enumerate(all_values[1:]):
+        rows.setdefault(row[key_col].lower(), i)
+    return rows
+
+
+def player_writes(all_values, deltas):
+    """Turns buffered player deltas into absolute (worksheet, range, values) writes."""
+    header, rows = all_values[0], all_values[1:]
+    elo_col = header.index("elo")
+    votes_col = header.index("Votes") if "Votes" in header else None
+    row_of = first_rows(all_values, header.index("name"))
+
+    writes = []
+    for name, delta in deltas.items():
+        i = row_of.get(name)
+        if i is None:
+            logger.warning("Dropping buffered vote for player %r: not on the sheet", name)
+            continue
+        new_elo = int(round(cell_number(rows[i][elo_col], 1500) + delta["elo"]))
+        if votes_col is None:
+            writes.append((elo_sheet, rowcol_to_a1(i + 2, elo_col + 1), [[new_elo]]))
+            continue
+
+        new_votes = int(cell_number(rows[i][votes_col], 0)) + delta["Votes"]
+        if votes_col == elo_col + 1:
+            # ✅ Adjacent columns: write Elo and Votes as one 1x2 range
+            cell_range = f"{rowcol_to_a1(i + 2, elo_col + 1)}:{rowcol_to_a1(i + 2, votes_col + 1)}"
+            writes.append((elo_sheet, cell_range, [[new_elo, new_votes]]))
+        else:
+            writes.append((elo_sheet, rowcol_to_a1(i + 2, elo_col + 1), [[new_elo]]))
+            writes.append((elo_sheet, rowcol_to_a1(i + 2, votes_col + 1), [[new_votes]]))
+    return writes
+
+
+def user_writes(all_values, deltas):
+    """Turns buffered user deltas into absolute (worksheet, range, values) writes."""
+    header, rows = all_values[0], all_values[1:]
+    cols = [header.index(name) for name in ("total_votes", "weekly_votes", "last_voted")]
+    row_of = first_rows(all_values, header.index("username"))
+
+    writes = []
+    for username, delta in deltas.items():
+        i = row_of.get(username)
+        if i is None:
+            logger.warning("Dropping buffered vote for user %r: not on the sheet", username)
+            continue
+        total_votes, weekly_votes, last_voted = (rows[i][col] for col in cols)
+        new_values = apply_user_delta(int(cell_number(total_votes, 0)), int(cell_number(weekly_votes, 0)), last_voted, delta)
+        if cols == list(range(cols[0], cols[0] + 3)):
+            # ✅ Contiguous columns: total, weekly and last voted as one range
+            cell_range = f"{rowcol_to_a1(i + 2, cols[0] + 1)}:{rowcol_to_a1(i + 2, cols[2] + 1)}"
+            writes.append((votes_sheet, cell_range, [list(new_values)]))
+        else:
+            for col, value in zip(cols, new_values):
+                writes.append((votes_sheet, rowcol_to_a1(i + 2, col + 1), [[value]]))
+    return writes
+
+
+def drop_sent(buffer, sent):
+    """Subtracts deltas that were written (or parked) from the pending ones; caller holds the lock."""
+    for kind, deltas in sent.items():
+        pending = buffer["pending"][kind]
+        for key, delta in deltas.items():
+            left = remaining_delta(pending[key], delta)
+            if left is None:
+                del pending[key]
+            else:
+                pending[key] = left
+
+
+def flush_writes(buffer=None):
+    """Applies every buffered delta to a fresh read, sent as one values batchUpdate per spreadsheet."""
+    buffer = buffer or get_write_buffer()
+    with buffer["flush_lock"]:
+        with buffer["lock"]:
+            sent = {kind: dict(deltas) for kind, deltas in buffer["pending"].items()}
+            buffer["votes"] = 0
+        if not any(sent.values()):
+            return
+
+        try:
+            # ✅ Deltas go on top of a fresh read, so votes from other sessions are never overwritten
+            players_values, votes_values = read_sheet_values()
+            writes = {"players": player_writes(players_values, sent["players"]), "users": user_writes(votes_values, sent["users"])}
+
+            # ✅ Sheet1 and UserVotes usually share a spreadsheet, so both land in one request
+            by_spreadsheet = {}
+            for kind, kind_writes in writes.items():
+                for worksheet, cell_range, values in kind_writes:
+                    spreadsheet = worksheet.spreadsheet
+                    _, data, kinds = by_spreadsheet.setdefault(spreadsheet.id, (spreadsheet, [], set()))
+                    data.append({"range": absolute_range_name(worksheet.title, cell_range), "values": values})
+                    kinds.add(kind)
+
+            # Deltas whose rows are all gone have nothing to send, drop them now
+            drop_landed(buffer, {kind: sent.pop(kind) for kind in list(sent) if sent[kind] and not writes[kind]})
+
+            for spreadsheet, data, kinds in by_spreadsheet.values():
+                spreadsheet.values_batch_update(body={"valueInputOption": "RAW", "data": data})
+
+                # ✅ Drop each spreadsheet's deltas as soon as its request lands, so a later
+                # failure (files kept apart) never re-sends them
+                drop_landed(buffer, {kind: sent.pop(kind) for kind in kinds})
+        except Exception:
+            with buffer["lock"]:
+                buffer["failures"] += 1
+                if buffer["failures"] < FLUSH_MAX_ATTEMPTS:
+                    logger.warning("Write flush failed (attempt %d), deltas stay pending", buffer["failures"], exc_info=True)
+                    return
+
+                # ✅ Don't let a write that can never succeed block every later vote
+                drop_sent(buffer, sent)
+                buffer["parked"].append(sent)
+                buffer["failures"] = 0
+            logger.exception("Write flush failed %d times, parked deltas: %s", FLUSH_MAX_ATTEMPTS, json.dumps(sent, default=str))
+            return
+
+        with buffer["lock"]:
+            buffer["failures"] = 0
+
+
+def drop_landed(buffer, landed):
+    """Drops written deltas and clears the cached reads in one locked step, so loaders never miss a vote."""
+    if not landed:
+        return
+    with buffer["lock"]:
+        drop_sent(buffer, landed)
+        invalidate_reads(buffer)
+
+
+def invalidate_reads(buffer):
+    """Starts a new read generation so no fetch begun before it is served again; caller holds the lock."""
+    buffer["generation"] += 1
+    get_players.clear()  # Frees the old entries; the new key already bypasses them
+    get_user_data.clear()
+    get_sheet_values.clear()
+
+
+def with_pending_players(df, pending):
+    """Adds buffered Elo and Votes changes onto a players frame (ranks follow)."""
+    if not pending["players"]:
+        return df
+
+    row_of = {}
+    for i, name in enumerate(df["name"].str.lower()):
+        row_of.setdefault(name, i)
+    elo, votes = df["elo"].to_numpy(copy=True), df["Votes"].to_numpy(copy=True)
+    for name, delta in pending["players"].items():
+        i = row_of.get(name)
+        if i is not None:
+            elo[i] += delta["elo"]
+            votes[i] += delta["Votes"]
+
+    df["elo"], df["Votes"] = elo, votes
+    df["pos_rank"] = position_ranks(df["pos"].to_numpy(), elo)
+    return df
 
-    # Get current values (convert to int if necessary)
-    user_current_total = int(df.loc[user_row.index[0], "total_votes"])
-    user_current_weekly = int(df.loc[user_row.index[0], "weekly_votes"])
-    user_last_voted = df.loc[user_row.index[0], "last_voted"]
 
-    # Reset weekly votes on Monday
-    if datetime.datetime.today().weekday() == 0 and user_last_voted != today:
-        updates.append({"range": f"R{row_idx}C{weekly_votes_col}", "values": [[0]]})
+def with_pending_users(df, pending):
+    """Adds buffered vote counts onto a user frame, including users not yet in the cached read."""
+    cols = ["total_votes", "weekly_votes", "last_voted"]
+    col_pos = [df.columns.get_loc(col) for col in cols]
+    for username, delta in pending["users"].items():
+        i = df.index.get_indexer_for([username])[0]
+        if i == -1:
+            new_row = dict(zip(["username"] + cols, [username, *apply_user_delta(0, 0, "", delta)]))
+            df = pd.concat([df, pd.DataFrame([new_row], index=[username])])
+        else:
+            current = (int(df.iat[i, col_pos[0]]), int(df.iat[i, col_pos[1]]), df.iat[i, col_pos[2]])
+            for pos, value in zip(col_pos, apply_user_delta(*current, delta)):
+                df.iat[i, pos] = value
+    return df
 
-    if count_vote:
-        updates.append({"range": f"R{row_idx}C{total_votes_col}", "values": [[user_current_total + 1]]})
-        updates.append({"range": f"R{row_idx}C{weekly_votes_col}", "values": [[user_current_weekly + 1]]})
 
-    updates.append({"range": f"R{row_idx}C{last_voted_col}", "values": [[today]]})
+def load_with_pending(loader, overlay):
+    """Calls a cached loader and overlays the buffered deltas, retrying if a flush lands in between."""
+    buffer = get_write_buffer()
+    while True:
+        generation = buffer["generation"]
+        df = loader(generation)  # ✅ Keyed by generation, so a fetch begun before a flush is never reused after it
+        with buffer["lock"]:
+            if buffer["generation"] == generation:
+                return overlay(df, buffer["pending"])
 
-    if updates:
-        votes_sheet.batch_update(updates)
 
+def load_players():
+    """Cached players plus every vote still waiting in the write buffer."""
+    return load_with_pending(get_players, with_pending_players)
 
-def update_google_sheet(player1_name, player1_new_elo, player2_name, player2_new_elo, player_data):
-    """Updates player Elo and Votes in Google Sheets without extra read requests."""
-    df = player_data
-    elo_col_index = df.columns.tolist().index("elo") + 1
-    votes_col_index = df.columns.tolist().index("Votes") + 1 if "Votes" in df.columns else None
 
-    player1_row = df[df["name"].str.lower() == player1_name.lower()].index[0] + 2
-    player2_row = df[df["name"].str.lower() == player2_name.lower()].index[0] + 2
+def load_user_data():
+    """Cached user data plus every vote still waiting in the write buffer."""
+    return load_with_pending(get_user_data, with_pending_users)
 
-    updates = []
-    
-    # ✅ Convert Elo values to float (avoids JSON serialization error)
-    updates.append({"range": f"R{player1_row}C{elo_col_index}", "values": [[float(player1_new_elo)]]})
-    updates.append({"range": f"R{player2_row}C{elo_col_index}", "values": [[float(player2_new_elo)]]})
 
-    if votes_col_index:
-        # ✅ Convert Votes from `int64` to standard Python `int`
-        new_player1_votes = int(df.loc[player1_row - 2, "Votes"]) + 1
-        new_player2_votes = int(df.loc[player2_row - 2, "Votes"]) + 1
+def rerank_positions(player_data, positions):
+    """Recomputes pos_rank in place for the given positions only, keeping the name lookup in sync."""
+    rank_col = st.session_state["col_idx"]["pos_rank"] - 1
+    pos_arr = st.session_state["pos_arr"]
 
-        updates.append({"range": f"R{player1_row}C{votes_col_index}", "values": [[new_player1_votes]]})
-        updates.append({"range": f"R{player2_row}C{votes_col_index}", "values": [[new_player2_votes]]})
+    # ✅ One lexsort over just the affected positions' rows (no pandas rank per group)
+    in_pos = np.flatnonzero(np.isin(pos_arr, list(positions)))
+    ranks = position_ranks(pos_arr[in_pos], st.session_state["elo_arr"][in_pos])
+    player_data.iloc[in_pos, rank_col] = ranks
 
-    # ✅ Send batch update to Google Sheets (single API call)
-    elo_sheet.batch_update(updates)
+    # Duplicate names only track their first row, like name_to_pos
+    name_to_pos, pos_rank_by_name = st.session_state["name_to_pos"], st.session_state["pos_rank_by_name"]
+    for row, name, rank in zip(in_pos, st.session_state["name_arr"][in_pos], ranks):
+        if name_to_pos[name.lower()] == row:
+            pos_rank_by_name[name.lower()] = rank
 
 ### ✅ **Process Vote (Now Uses Preloaded Data)**
 def process_vote(selected_player):
     with st.status("Submitting your pick and adjusting the rankings! ⏳", expanded=False) as status:
-        player_data = get_players()  # ✅ Load players from the Google Sheet
-        user_data = get_user_data()  # ✅ Load user data from the Google Sheet
+        player_data = st.session_state["players_cache"]  # ✅ Reuse the session's player data
 
         if selected_player == player1["name"]:
             new_elo1, new_elo2 = calculate_elo(player1["elo"], player2["elo"])
         else:
             new_elo2, new_elo1 = calculate_elo(player2["elo"], player1["elo"])
 
-        # ✅ Now passing `player_data` correctly to avoid the TypeError
-        update_google_sheet(player1["name"], new_elo1, player2["name"], new_elo2, player_data)
-        update_user_vote(st.session_state["username"], count_vote=True, user_data=user_data)
+        # ✅ Buffer changes, not absolute values, so concurrent sessions' votes all add up
+        elo_changes = ((player1["name"], new_elo1 - player1["elo"]), (player2["name"], new_elo2 - player2["elo"]))
+        update_google_sheet(*elo_changes[0], *elo_changes[1])
+        update_user_vote(st.session_state["username"], count_vote=True)
+
+        buffer = get_write_buffer()
+        with buffer["lock"]:
+            buffer["votes"] += 1
+            flush_now = buffer["votes"] >= FLUSH_EVERY_VOTES
+        if flush_now:
+            buffer["wake"].set()  # ✅ Let the flusher thread send the batch; the vote doesn't wait on it
+
+        # ✅ Keep the session's player data in sync with what was just written
+        for name, elo_change in elo_changes:
+            row_pos = st.session_state["name_to_pos"][name.lower()]
+            new_elo = st.session_state["elo_arr"][row_pos] + elo_change
+            player_data.iloc[row_pos, st.session_state["col_idx"]["elo"] - 1] = new_elo
+            player_data.iloc[row_pos, st.session_state["col_idx"]["Votes"] - 1] += 1
+            st.session_state["elo_arr"][row_pos] = new_elo
+            st.session_state["elo_by_name"][name.lower()] = new_elo
+
+        # ✅ Only the voted players' positions can change rank
+        rerank_positions(player_data, {player1["pos"], player2["pos"]})
+
+        # ✅ Elo changed, rebuild the alias table and sorted Elo index on next run
+        for key in ("elo_alias", "elo_order", "sorted_elo"):
+            st.session_state.pop(key, None)
 
         st.session_state["updated_elo"] = {player1["name"]: new_elo1, player2["name"]: new_elo2}
         st.session_state["selected_player"] = selected_player
@@ -141,70 +523,146 @@ def process_vote(selected_player):
 def get_player_elo(player_name):
     """Fetches the Elo rating for a given player from cached player data."""
     try:
-        df = st.session_state["players_cache"]  # ✅ Use cached players data
-
-        # Find player and get their Elo
-        player_row = df[df["name"].str.lower() == player_name.lower()]
-        if not player_row.empty:
-            return float(player_row["elo"].values[0])  # Convert Elo to float
-        else:
-            return None  # Player not found
+        elo = st.session_state["elo_by_name"].get(player_name.lower())  # ✅ O(1) lookup
+        return float(elo) if elo is not None else None  # Convert Elo to float, None if not found
 
     except Exception as e:
         st.error(f"❌ Error fetching player Elo: {e}")
         return None
 
-# Elo Calculation (Moved Above Process_Vote)
-def calculate_elo(winner_elo, loser_elo, k=24):
-    expected_winner = 1 / (1 + 10 ** ((loser_elo - winner_elo) / 400))
-    expected_loser = 1 / (1 + 10 ** ((winner_elo - loser_elo) / 400))
-    new_winner_elo = winner_elo + k * (1 - expected_winner)
-    new_loser_elo = loser_elo + k * (0 - expected_loser)
-    return round(new_winner_elo), round(new_loser_elo)
+# Expected score of the higher-rated side for every integer Elo gap up to the limit
+EXPECTED_SCORE_LIMIT = 800
+EXPECTED_SCORE_TABLE = (
+    1.0 / (1.0 + 10.0 ** (-np.arange(-EXPECTED_SCORE_LIMIT, EXPECTED_SCORE_LIMIT + 1) / 400.0))
+).tolist()
 
-def aggressive_weighted_selection(df, weight_col="elo", alpha=6):
-    df = df.copy()  # ✅ Ensure modifications are on a separate copy
+def expected_score(elo_diff):
+    """Expected score for a player `elo_diff` points above their opponent (table lookup when possible)."""
+    elo_diff = float(elo_diff)
+    if elo_diff.is_integer() and abs(elo_diff) <= EXPECTED_SCORE_LIMIT:
+        return EXPECTED_SCORE_TABLE[int(elo_diff) + EXPECTED_SCORE_LIMIT]
+    return 1 / (1 + 10 ** (-elo_diff / 400))
 
-    max_elo = df[weight_col].max()
-    min_elo = df[weight_col].min()
-    
-    # Normalize Elo scores to avoid extreme weighting
-    df.loc[:, "normalized_elo"] = (df[weight_col] - min_elo) / (max_elo - min_elo)
-    
-    # Exponentiate with alpha for stronger weighting on higher Elo players
-    df.loc[:, "weight"] = df["normalized_elo"] ** alpha
-    
-    # Normalize weights to sum to 1 (softmax-like effect)
-    df.loc[:, "weight"] = df["weight"] / df["weight"].sum()
-    
-    # Select based on weighted probability
-    selected_index = random.choices(df.index, weights=df["weight"], k=1)[0]
-    return df.loc[selected_index]
+# Elo Calculation (Moved Above Process_Vote)
+def calculate_elo(winner_elo, loser_elo, k=24):
+    expected_winner = expected_score(winner_elo - loser_elo)
+    delta = k * (1 - expected_winner)  # expected_loser == 1 - expected_winner, so the loser drops by the same amount
+    return round(winner_elo + delta), round(loser_elo - delta)
+
+# ✅ One PCG64 generator for the vectorized draws (faster than the legacy np.random state)
+rng = np.random.default_rng()
+
+def build_elo_weights(elo, alpha=6):
+    """Builds the (unnormalized) selection weights for an array of Elo ratings."""
+    min_elo, max_elo = elo.min(), elo.max()
+
+    # Normalize Elo scores to avoid extreme weighting, then exponentiate with
+    # alpha for stronger weighting on higher Elo players
+    if max_elo > min_elo:
+        return ((elo - min_elo) / (max_elo - min_elo)) ** alpha
+    return np.ones_like(elo)
+
+def build_alias_table(weights):
+    """Builds Walker/Vose alias tables (prob, alias) for O(1) weighted sampling."""
+    n = len(weights)
+    scaled = (weights * (n / weights.sum())).tolist()
+    prob, alias = [1.0] * n, list(range(n))
+
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] += scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+
+    return prob, alias  # Leftovers keep prob 1.0 (only float drift puts them there)
+
+def alias_selection(df, alias_table):
+    """Picks a row in O(1) using tables from build_alias_table."""
+    prob, alias = alias_table
+    i = random.randrange(len(prob))
+    return df.iloc[i if random.random() < prob[i] else alias[i]]
+
+def aggressive_weighted_selection(df, positions=None, weight_col="elo", alpha=6):
+    """Weighted pick among the rows of df at `positions` (all rows if None), without building a sub-frame."""
+    elo = df[weight_col].to_numpy(dtype=np.float64)
+    if positions is not None:
+        elo = elo[positions]
+    weights = build_elo_weights(elo, alpha)
+
+    # Select based on weighted probability with Efraimidis-Spirakis keys: the row with
+    # the largest log(u) / w wins, in one vectorized pass with no cumulative sum
+    with np.errstate(divide="ignore"):
+        keys = np.log(rng.random(len(weights))) / weights
+    selected = int(np.argmax(keys))
+    return df.iloc[selected if positions is None else positions[selected]]
+
+def elo_window(sorted_elo, elo_order, center_elo, width=50):
+    """Returns the row positions strictly within `width` Elo of `center_elo` via binary search."""
+    lo = np.searchsorted(sorted_elo, center_elo - width, side="right")
+    hi = np.searchsorted(sorted_elo, center_elo + width, side="left")
+    return elo_order[lo:hi]  # A view, nothing is copied
+
+def player_card_html(name, team, pos, image_url):
+    """Renders a player's card HTML."""
+    return (
+        f'<div style="padding: 10px; border-radius: 10px; text-align: center;">'
+        f'<img src="{image_url}" width="150" style="display: block; margin: auto;">'
+        f'<p style="margin-top: 10px; font-size: 16px; text-align: center;">{name} ({team} | {pos})</p>'
+        f'</div>'
+    )
 
 def display_player(player, col):
     with col:
         st.markdown(
-            f'<div style="padding: 10px; border-radius: 10px; text-align: center;">'
-            f'<img src="{player["image_url"]}" width="150" style="display: block; margin: auto;">'
-            f'<p style="margin-top: 10px; font-size: 16px; text-align: center;">{player["name"]} ({player["team"]} | {player["pos"]})</p>'
-            f'</div>',
+            player_card_html(player["name"], player["team"], player["pos"], player["image_url"]),
             unsafe_allow_html=True
         )
 
         if st.button("Draft", key=f"{player['name']}_{col}", use_container_width=True):
             process_vote(player["name"])
 
-if "players_cache" not in st.session_state:
-    st.session_state["players_cache"] = get_players()  # ✅ Load players ONCE per session
+# ✅ Reload the session's players at most once a minute (picks up other users' votes); the
+# loader overlays every unflushed or in-flight vote, so a reload never rolls one back
+PLAYERS_REFRESH_SECONDS = 60
+players_stale = time.time() - st.session_state.get("players_ts", 0) > PLAYERS_REFRESH_SECONDS
+if "players_cache" not in st.session_state or players_stale:
+    players = load_players()  # ✅ Cached, plus votes still waiting to be flushed
+    st.session_state["players_cache"] = players
+    st.session_state["players_ts"] = time.time()
+    st.session_state.pop("elo_alias", None)  # Selection tables below follow the reloaded Elo
+
+    # ✅ Raw column arrays so reruns skip repeated pandas label lookups
+    st.session_state["elo_arr"] = players["elo"].to_numpy(dtype=np.float64, copy=True)
+    st.session_state["name_arr"] = players["name"].to_numpy()
+    st.session_state["pos_arr"] = players["pos"].to_numpy()
+
+    # ✅ O(1) name and column lookups instead of scanning the frame on every rerun
+    st.session_state["col_idx"] = {col: i + 1 for i, col in enumerate(players.columns)}
+    name_to_pos = {}
+    for i, name in enumerate(st.session_state["name_arr"]):
+        name_to_pos.setdefault(name.lower(), i)  # First match wins, same row the flusher updates
+    st.session_state["name_to_pos"] = name_to_pos
+    st.session_state["elo_by_name"] = {name: st.session_state["elo_arr"][i] for name, i in name_to_pos.items()}
+    st.session_state["pos_rank_by_name"] = {name: players["pos_rank"].iat[i] for name, i in name_to_pos.items()}
 players = st.session_state["players_cache"]
 
+# ✅ Build the selection alias table and sorted Elo index once, rebuilt only after Elo changes
+if "elo_alias" not in st.session_state:
+    elo = st.session_state["elo_arr"]
+    st.session_state["elo_alias"] = build_alias_table(build_elo_weights(elo))  # ✅ O(1) draws over all players
+    st.session_state["elo_order"] = np.argsort(elo, kind="stable")
+    st.session_state["sorted_elo"] = elo[st.session_state["elo_order"]]
+    st.session_state.pop("last_player1", None)  # The cached player2 window indexed the old order
+
 # Initialize session state variables
 if "player1" not in st.session_state or "player2" not in st.session_state:
-    st.session_state.player1 = aggressive_weighted_selection(players)
-    st.session_state.player2_candidates = players[
-        (players["elo"] > st.session_state.player1["elo"] - 50) & (players["elo"] < st.session_state.player1["elo"] + 50)
-    ]
-    st.session_state.player2 = aggressive_weighted_selection(st.session_state.player2_candidates) if not st.session_state.player2_candidates.empty else aggressive_weighted_selection(players)
+    st.session_state.player1 = alias_selection(players, st.session_state["elo_alias"])
+    st.session_state.player2_candidates = elo_window(
+        st.session_state["sorted_elo"], st.session_state["elo_order"], st.session_state.player1["elo"]
+    )
+    st.session_state.player2 = aggressive_weighted_selection(players, st.session_state.player2_candidates) if len(st.session_state.player2_candidates) else alias_selection(players, st.session_state["elo_alias"])
 
 # Ensure initial_elo is always initialized
 if "initial_elo" not in st.session_state:
@@ -229,9 +687,12 @@ player2 = st.session_state.player2
 player1_elo = get_player_elo(player1["name"])
 player2_elo = get_player_elo(player2["name"])
 
-# ✅ Fetch Value from HPPR Sheet (like before)
-player1_value = get_player_value(player1["name"])
-player2_value = get_player_value(player2["name"])
+# ✅ Fetch Value from HPPR Sheet once per matchup (reruns reuse it)
+matchup_key = (player1["name"], player2["name"])
+if st.session_state.get("matchup_values_key") != matchup_key:
+    st.session_state["matchup_values"] = (get_player_value(player1["name"]), get_player_value(player2["name"]))
+    st.session_state["matchup_values_key"] = matchup_key
+player1_value, player2_value = st.session_state["matchup_values"]
 
 # ✅ Determine Nick's Pick (Highest Value with Elo Tie-Breaker)
 if player1_value is not None and player2_value is not None:
@@ -248,7 +709,7 @@ else:
 st.markdown("<h3 style='text-align: center;'>Enter Your Username to Track Your Rank:</h3>", unsafe_allow_html=True)
 username = st.text_input("Username", value=st.session_state.get("username", ""), max_chars=15)
 
-if username and "username" not in st.session_state:
+if username and st.session_state.get("username") != username:
     st.session_state["username"] = username
     update_user_vote(username, count_vote=False)  # ✅ Only track user, don't count extra vote
 
@@ -266,22 +727,18 @@ if st.session_state["selected_player"]:
     st.markdown("<h3 style='text-align: center;'>FFA Community Elo Ratings</h3>", unsafe_allow_html=True)
 
     # Gather player data and sort by ELO (highest first)
-    player_data = [
-        {
-            "name": player1["name"],
-            "elo": st.session_state["updated_elo"].get(player1["name"], player1["elo"]),
-            "change": st.session_state["updated_elo"].get(player1["name"], player1["elo"]) - st.session_state["initial_elo"].get(player1["name"], player1["elo"]),
-            "pos": player1["pos"],
-            "rank": players.loc[players["name"] == player1["name"], "pos_rank"].values[0]
-        },
-        {
-            "name": player2["name"],
-            "elo": st.session_state["updated_elo"].get(player2["name"], player2["elo"]),
-            "change": st.session_state["updated_elo"].get(player2["name"], player2["elo"]) - st.session_state["initial_elo"].get(player2["name"], player2["elo"]),
-            "pos": player2["pos"],
-            "rank": players.loc[players["name"] == player2["name"], "pos_rank"].values[0]
-        }
-    ]
+    updated_elo, initial_elo = st.session_state["updated_elo"], st.session_state["initial_elo"]
+    player_data = []
+    for player in (player1, player2):
+        name = player["name"]
+        elo = updated_elo.get(name, player["elo"])  # ✅ One lookup per player, reused for the change
+        player_data.append({
+            "name": name,
+            "elo": elo,
+            "change": elo - initial_elo.get(name, player["elo"]),
+            "pos": player["pos"],
+            "rank": st.session_state["pos_rank_by_name"][name.lower()]
+        })
 
     # Sort players by ELO (highest first)
     player_data.sort(key=lambda x: x["elo"], reverse=True)
@@ -312,15 +769,11 @@ if st.session_state["selected_player"]:
     )
 
     # ✅ Load leaderboard data
-    df = get_user_data()
-    
-    # Ensure columns are numeric before sorting
-    df["total_votes"] = pd.to_numeric(df["total_votes"], errors="coerce").fillna(0).astype(int)
-    df["weekly_votes"] = pd.to_numeric(df["weekly_votes"], errors="coerce").fillna(0).astype(int)
+    df = load_user_data()  # ✅ Cached, plus votes (this session's too) still waiting to be flushed
     
     # 🏆 All-Time Leaderboard (Sorted by All Time Votes - Highest First)
     st.markdown("## 🏆 All-Time Leaderboard (Total Votes)")
-    df_all_time = df.copy().sort_values(by="total_votes", ascending=False).head(5)  # ✅ Sort descending
+    df_all_time = df.nlargest(5, "total_votes")  # ✅ Top 5 without a full sort
     df_all_time["Rank"] = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][: len(df_all_time)]  # ✅ Assign ranking icons
     df_all_time = df_all_time.rename(
         columns={
@@ -334,7 +787,7 @@ if st.session_state["selected_player"]:
     
     # ⏳ Weekly Leaderboard (Sorted by Weekly Votes - Highest First)
     st.markdown("## ⏳ Weekly Leaderboard (Resets on Monday)")
-    df_weekly = df.copy().sort_values(by="weekly_votes", ascending=False).head(5)  # ✅ Sort descending
+    df_weekly = df.nlargest(5, "weekly_votes")  # ✅ Top 5 without a full sort
     df_weekly["Rank"] = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][: len(df_weekly)]  # ✅ Assign ranking icons
     df_weekly = df_weekly.rename(
         columns={
@@ -353,18 +806,17 @@ if st.session_state["selected_player"]:
     if st.button("Next Matchup", key="next_matchup", use_container_width=True):
         with st.status("Loading next matchup... ⏳", expanded=False) as status:
             # ✅ Select new Player 1 instantly from cached players
-            st.session_state["player1"] = aggressive_weighted_selection(players)
+            st.session_state["player1"] = alias_selection(players, st.session_state["elo_alias"])
     
             # ✅ Filter player2_candidates only if Player 1 has changed
             if "last_player1" not in st.session_state or st.session_state["last_player1"] != st.session_state["player1"]["name"]:
-                st.session_state["player2_candidates"] = players[
-                    (players["elo"] > st.session_state["player1"]["elo"] - 50) &
-                    (players["elo"] < st.session_state["player1"]["elo"] + 50)
-                ]
+                st.session_state["player2_candidates"] = elo_window(
+                    st.session_state["sorted_elo"], st.session_state["elo_order"], st.session_state["player1"]["elo"]
+                )
                 st.session_state["last_player1"] = st.session_state["player1"]["name"]  # ✅ Track last Player 1
     
             # ✅ Select Player 2 instantly
-            st.session_state["player2"] = aggressive_weighted_selection(st.session_state["player2_candidates"]) if not st.session_state["player2_candidates"].empty else aggressive_weighted_selection(players)
+            st.session_state["player2"] = aggressive_weighted_selection(players, st.session_state["player2_candidates"]) if len(st.session_state["player2_candidates"]) else alias_selection(players, st.session_state["elo_alias"])
     
             # ✅ Store Elo data in session state
             st.session_state["initial_elo"] = {